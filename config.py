@@ -18,6 +18,10 @@ MAX_RESULTS_DEFAULT = 5  # Default results per source
 MAX_RESULTS_LIMIT = 50  # Maximum allowed results per source
 REQUEST_RETRIES = 2  # Number of retries on failure
 
+# Response cache (used when requests-cache is installed)
+CACHE_PATH = OUTPUT_DIR / ".cache"  # SQLite cache file (".sqlite" is appended)
+CACHE_EXPIRE_AFTER = 3600  # Seconds before cached responses are refetched
+
 # Available search sources
 AVAILABLE_SOURCES = [
     "wikipedia",
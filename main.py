@@ -6,20 +6,75 @@ Usage: python main.py --keyword "search term" --sources wikipedia github
 """
 
 import argparse
+import html
 import json
 import csv
+import re
 import sys
 import time
+from dataclasses import asdict, dataclass
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict, Any
+from typing import List, TextIO
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, quote
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
+from urllib.parse import urljoin
+
+try:
+    import orjson
+except ImportError:  # Fall back to stdlib json
+    orjson = None
+
+try:
+    import requests_cache
+except ImportError:  # Response caching is optional
+    requests_cache = None
 
 import config
 from config import Colors
 
+_json_loads = orjson.loads if orjson else json.loads
+
+# Wikipedia wraps matched terms in <span class="searchmatch"> tags
+_SPAN_RE = re.compile(r"</?span[^>]*>")
+
+# Static query parameters per source - searchers only add keyword and result limit
+_WIKI_PARAMS = {'action': 'query', 'format': 'json', 'list': 'search'}
+_GITHUB_PARAMS = {'sort': 'stars', 'order': 'desc'}
+_STACKOVERFLOW_PARAMS = {'sort': 'relevance', 'order': 'desc', 'site': 'stackoverflow.com'}
+_HACKERNEWS_PARAMS = {'tags': 'story'}
+
+# Shared HTTP session - reuses keep-alive connections across searchers and retries
+_RETRY = Retry(
+    total=config.REQUEST_RETRIES,
+    backoff_factor=0.3,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(['GET'])
+)
+if requests_cache:
+    # Repeat searches within CACHE_EXPIRE_AFTER are served from disk without hitting the APIs
+    _SESSION = requests_cache.CachedSession(str(config.CACHE_PATH), expire_after=config.CACHE_EXPIRE_AFTER)
+else:
+    _SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=_RETRY))
+_SESSION.headers['User-Agent'] = config.USER_AGENT
+
+# ============================================================================
+# DATA MODELS
+# ============================================================================
+
+@dataclass(slots=True)
+class Result:
+    """Single search result (timestamp is the search batch time, not per-item)"""
+    source: str
+    title: str
+    description: str
+    url: str
+    timestamp: str
+
+
 # ============================================================================
 # SEARCHER CLASSES - Each source has its own searcher
 # ============================================================================
@@ -27,175 +82,156 @@ from config import Colors
 class BaseSearcher:
     """Base class for all search sources"""
     
-    def __init__(self, keyword: str, max_results: int = 5):
+    def __init__(self, keyword: str, max_results: int = 5, timestamp: str = None):
         self.keyword = keyword
         self.max_results = min(max_results, config.MAX_RESULTS_LIMIT)
+        self.timestamp = timestamp or datetime.now().isoformat()  # Batch timestamp shared by all results
         self.results = []
         self.source_name = "base"
     
-    def search(self) -> List[Dict[str, Any]]:
+    def search(self) -> List[Result]:
         """Override in subclasses"""
         raise NotImplementedError
     
     def _safe_request(self, url: str, **kwargs) -> requests.Response:
-        """Make HTTP request with error handling"""
-        headers = kwargs.get('headers', {})
-        headers['User-Agent'] = config.USER_AGENT
-        kwargs['headers'] = headers
-        
-        for attempt in range(config.REQUEST_RETRIES):
-            try:
-                response = requests.get(url, timeout=config.TIMEOUT, **kwargs)
-                response.raise_for_status()
-                return response
-            except Exception as e:
-                if attempt == config.REQUEST_RETRIES - 1:
-                    raise
-                time.sleep(1)
-        return None
+        """Make HTTP request with error handling (retries are handled by the session adapter)"""
+        response = _SESSION.get(url, timeout=config.TIMEOUT, **kwargs)
+        response.raise_for_status()
+        return response
 
 
 class WikipediaSearcher(BaseSearcher):
     """Search Wikipedia for keyword"""
     
-    def __init__(self, keyword: str, max_results: int = 5):
-        super().__init__(keyword, max_results)
+    def __init__(self, keyword: str, max_results: int = 5, timestamp: str = None):
+        super().__init__(keyword, max_results, timestamp)
         self.source_name = "wikipedia"
     
-    def search(self) -> List[Dict[str, Any]]:
+    def search(self) -> List[Result]:
         try:
-            params = {
-                'action': 'query',
-                'format': 'json',
-                'list': 'search',
-                'srsearch': self.keyword,
-                'srlimit': self.max_results
-            }
+            params = {**_WIKI_PARAMS, 'srsearch': self.keyword, 'srlimit': self.max_results}
             response = self._safe_request(config.WIKIPEDIA_API, params=params)
-            data = response.json()
+            data = _json_loads(response.content)
             
             for item in data.get('query', {}).get('search', []):
-                self.results.append({
-                    'source': self.source_name,
-                    'title': item.get('title', ''),
-                    'description': item.get('snippet', '').replace('<span class=\'searchmatch\'>', '').replace('</span>', ''),
-                    'url': f"https://en.wikipedia.org/wiki/{item.get('title', '').replace(' ', '_')}",
-                    'timestamp': datetime.now().isoformat()
-                })
+                if len(self.results) >= self.max_results:
+                    break
+                self.results.append(Result(
+                    source=self.source_name,
+                    title=item.get('title', ''),
+                    description=html.unescape(_SPAN_RE.sub('', item.get('snippet', ''))),
+                    url=f"https://en.wikipedia.org/wiki/{item.get('title', '').replace(' ', '_')}",
+                    timestamp=self.timestamp
+                ))
         except Exception as e:
             print(f"{Colors.YELLOW}[!] Wikipedia search failed: {str(e)}{Colors.ENDC}")
         
-        return self.results[:self.max_results]
+        return self.results
 
 
 class GitHubSearcher(BaseSearcher):
     """Search GitHub repositories"""
     
-    def __init__(self, keyword: str, max_results: int = 5):
-        super().__init__(keyword, max_results)
+    def __init__(self, keyword: str, max_results: int = 5, timestamp: str = None):
+        super().__init__(keyword, max_results, timestamp)
         self.source_name = "github"
     
-    def search(self) -> List[Dict[str, Any]]:
+    def search(self) -> List[Result]:
         try:
-            params = {
-                'q': self.keyword,
-                'sort': 'stars',
-                'order': 'desc',
-                'per_page': self.max_results
-            }
+            params = {**_GITHUB_PARAMS, 'q': self.keyword, 'per_page': self.max_results}
             response = self._safe_request(config.GITHUB_API, params=params)
-            data = response.json()
+            data = _json_loads(response.content)
             
             for item in data.get('items', []):
-                self.results.append({
-                    'source': self.source_name,
-                    'title': item.get('name', ''),
-                    'description': item.get('description', 'No description provided'),
-                    'url': item.get('html_url', ''),
-                    'timestamp': datetime.now().isoformat()
-                })
+                if len(self.results) >= self.max_results:
+                    break
+                self.results.append(Result(
+                    source=self.source_name,
+                    title=item.get('name', ''),
+                    description=item.get('description') or 'No description provided',
+                    url=item.get('html_url', ''),
+                    timestamp=self.timestamp
+                ))
         except Exception as e:
             print(f"{Colors.YELLOW}[!] GitHub search failed: {str(e)}{Colors.ENDC}")
         
-        return self.results[:self.max_results]
+        return self.results
 
 
 class StackOverflowSearcher(BaseSearcher):
     """Search Stack Overflow questions"""
     
-    def __init__(self, keyword: str, max_results: int = 5):
-        super().__init__(keyword, max_results)
+    def __init__(self, keyword: str, max_results: int = 5, timestamp: str = None):
+        super().__init__(keyword, max_results, timestamp)
         self.source_name = "stackoverflow"
     
-    def search(self) -> List[Dict[str, Any]]:
+    def search(self) -> List[Result]:
         try:
-            params = {
-                'intitle': self.keyword,
-                'sort': 'relevance',
-                'order': 'desc',
-                'pagesize': self.max_results,
-                'site': 'stackoverflow.com'
-            }
+            params = {**_STACKOVERFLOW_PARAMS, 'intitle': self.keyword, 'pagesize': self.max_results}
             response = self._safe_request(config.STACKOVERFLOW_API, params=params)
-            data = response.json()
+            data = _json_loads(response.content)
             
             for item in data.get('items', []):
-                self.results.append({
-                    'source': self.source_name,
-                    'title': item.get('title', '').replace('&quot;', '"').replace('&amp;', '&'),
-                    'description': f"Score: {item.get('score', 0)}, Tags: {', '.join(item.get('tags', []))}",
-                    'url': item.get('link', ''),
-                    'timestamp': datetime.now().isoformat()
-                })
+                if len(self.results) >= self.max_results:
+                    break
+                self.results.append(Result(
+                    source=self.source_name,
+                    title=html.unescape(item.get('title', '')),
+                    description=f"Score: {item.get('score', 0)}, Tags: {', '.join(item.get('tags', []))}",
+                    url=item.get('link', ''),
+                    timestamp=self.timestamp
+                ))
         except Exception as e:
             print(f"{Colors.YELLOW}[!] Stack Overflow search failed: {str(e)}{Colors.ENDC}")
         
-        return self.results[:self.max_results]
+        return self.results
 
 
 class HackerNewsSearcher(BaseSearcher):
     """Search Hacker News"""
     
-    def __init__(self, keyword: str, max_results: int = 5):
-        super().__init__(keyword, max_results)
+    def __init__(self, keyword: str, max_results: int = 5, timestamp: str = None):
+        super().__init__(keyword, max_results, timestamp)
         self.source_name = "hackernews"
     
-    def search(self) -> List[Dict[str, Any]]:
+    def search(self) -> List[Result]:
         try:
-            params = {
-                'query': self.keyword,
-                'hitsPerPage': self.max_results,
-                'tags': 'story'
-            }
+            params = {**_HACKERNEWS_PARAMS, 'query': self.keyword, 'hitsPerPage': self.max_results}
             response = self._safe_request(config.HACKERNEWS_API, params=params)
-            data = response.json()
+            data = _json_loads(response.content)
             
             for item in data.get('hits', []):
-                self.results.append({
-                    'source': self.source_name,
-                    'title': item.get('title', ''),
-                    'description': f"Points: {item.get('points', 0)}, Comments: {item.get('num_comments', 0)}",
-                    'url': item.get('url', '') or f"https://news.ycombinator.com/item?id={item.get('objectID', '')}",
-                    'timestamp': datetime.now().isoformat()
-                })
+                if len(self.results) >= self.max_results:
+                    break
+                self.results.append(Result(
+                    source=self.source_name,
+                    title=item.get('title', ''),
+                    description=f"Points: {item.get('points', 0)}, Comments: {item.get('num_comments', 0)}",
+                    url=item.get('url', '') or f"https://news.ycombinator.com/item?id={item.get('objectID', '')}",
+                    timestamp=self.timestamp
+                ))
         except Exception as e:
             print(f"{Colors.YELLOW}[!] Hacker News search failed: {str(e)}{Colors.ENDC}")
         
-        return self.results[:self.max_results]
+        return self.results
 
 
 class GoogleNewsSearcher(BaseSearcher):
     """Search Google News (basic HTML parsing)"""
     
-    def __init__(self, keyword: str, max_results: int = 5):
-        super().__init__(keyword, max_results)
+    def __init__(self, keyword: str, max_results: int = 5, timestamp: str = None):
+        super().__init__(keyword, max_results, timestamp)
         self.source_name = "googlenews"
     
-    def search(self) -> List[Dict[str, Any]]:
+    def search(self) -> List[Result]:
         try:
-            url = f"{config.GOOGLE_NEWS_URL}?q={quote(self.keyword)}"
-            response = self._safe_request(url)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response = self._safe_request(config.GOOGLE_NEWS_URL, params={'q': self.keyword})
+            # Only build the <article> subtrees; fall back to html.parser if lxml is missing
+            strainer = SoupStrainer('article')
+            try:
+                soup = BeautifulSoup(response.content, 'lxml', parse_only=strainer)
+            except FeatureNotFound:
+                soup = BeautifulSoup(response.content, 'html.parser', parse_only=strainer)
             
             articles = soup.find_all('article', limit=self.max_results)
             
@@ -206,19 +242,19 @@ class GoogleNewsSearcher(BaseSearcher):
                     desc_elem = article.find('p')
                     
                     if title_elem and link_elem:
-                        self.results.append({
-                            'source': self.source_name,
-                            'title': title_elem.get_text(strip=True),
-                            'description': desc_elem.get_text(strip=True) if desc_elem else "News article",
-                            'url': link_elem.get('href', ''),
-                            'timestamp': datetime.now().isoformat()
-                        })
+                        self.results.append(Result(
+                            source=self.source_name,
+                            title=title_elem.get_text(strip=True),
+                            description=desc_elem.get_text(strip=True) if desc_elem else "News article",
+                            url=link_elem.get('href', ''),
+                            timestamp=self.timestamp
+                        ))
                 except:
                     continue
         except Exception as e:
             print(f"{Colors.YELLOW}[!] Google News search failed: {str(e)}{Colors.ENDC}")
         
-        return self.results[:self.max_results]
+        return self.results
 
 
 # ============================================================================
@@ -229,8 +265,8 @@ class ReportGenerator:
     """Generate reports in various formats"""
     
     @staticmethod
-    def to_json(all_results: List[Dict], keyword: str, search_time: float, sources: List[str]) -> str:
-        """Generate JSON report"""
+    def to_json(all_results: List[Result], keyword: str, search_time: float, sources: List[str]) -> bytes:
+        """Generate JSON report as UTF-8 bytes"""
         report = {
             'search': {
                 'keyword': keyword,
@@ -241,26 +277,25 @@ class ReportGenerator:
             },
             'results': all_results
         }
-        return json.dumps(report, indent=2, ensure_ascii=False)
+        if orjson:
+            # orjson serializes dataclasses natively
+            return orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        return json.dumps(report, indent=2, ensure_ascii=False, default=asdict).encode('utf-8')
     
     @staticmethod
-    def to_csv(all_results: List[Dict]) -> str:
-        """Generate CSV report"""
+    def to_csv(all_results: List[Result], fileobj: TextIO) -> None:
+        """Write CSV report to an open file"""
         if not all_results:
-            return "No results found"
-        
-        output = "source,title,description,url,timestamp\n"
-        for result in all_results:
-            row = [
-                result.get('source', ''),
-                f'"{result.get("title", "").replace(chr(34), chr(34)+chr(34))}"',
-                f'"{result.get("description", "").replace(chr(34), chr(34)+chr(34))}"',
-                result.get('url', ''),
-                result.get('timestamp', '')
-            ]
-            output += ','.join(row) + '\n'
+            fileobj.write("No results found")
+            return
         
-        return output
+        writer = csv.DictWriter(
+            fileobj,
+            fieldnames=['source', 'title', 'description', 'url', 'timestamp'],
+            quoting=csv.QUOTE_MINIMAL
+        )
+        writer.writeheader()
+        writer.writerows(asdict(result) for result in all_results)
 
 
 # ============================================================================
@@ -275,6 +310,7 @@ class WebIntelligenceGatherer:
         self.sources = sources
         self.max_results = max_results
         self.all_results = []
+        self.by_source = {}
         self.search_time = 0
         
         # Validate keyword
@@ -289,7 +325,7 @@ class WebIntelligenceGatherer:
         if invalid_sources:
             raise ValueError(f"Invalid sources: {invalid_sources}")
     
-    def _get_searcher(self, source: str) -> BaseSearcher:
+    def _get_searcher(self, source: str, timestamp: str) -> BaseSearcher:
         """Get appropriate searcher for source"""
         searchers = {
             'wikipedia': WikipediaSearcher,
@@ -303,11 +339,12 @@ class WebIntelligenceGatherer:
         if not searcher_class:
             return None
         
-        return searcher_class(self.keyword, self.max_results)
+        return searcher_class(self.keyword, self.max_results, timestamp)
     
-    def search(self) -> List[Dict]:
+    def search(self) -> List[Result]:
         """Execute multi-source search with threading"""
         start_time = time.time()
+        batch_ts = datetime.now().isoformat()  # One timestamp for the whole search batch
         
         print(f"\n{Colors.HEADER}{Colors.BOLD}🔍 Starting Web Intelligence Search{Colors.ENDC}")
         print(f"{Colors.CYAN}Keyword: {Colors.BOLD}{self.keyword}{Colors.ENDC}")
@@ -319,7 +356,7 @@ class WebIntelligenceGatherer:
             futures = {}
             
             for source in self.sources:
-                searcher = self._get_searcher(source)
+                searcher = self._get_searcher(source, batch_ts)
                 if searcher:
                     future = executor.submit(searcher.search)
                     futures[future] = source
@@ -336,48 +373,45 @@ class WebIntelligenceGatherer:
         
         self.search_time = time.time() - start_time
         
-        # Deduplicate results
-        unique_results = []
-        seen_urls = set()
-        
+        # Deduplicate results by URL (URL-less results are kept) and group by source in one pass
+        by_url = {}
+        by_source = {}
         for result in self.all_results:
-            url = result.get('url', '')
-            if url and url not in seen_urls:
-                unique_results.append(result)
-                seen_urls.add(url)
+            url = result.url or id(result)
+            if url not in by_url:
+                by_url[url] = result
+                by_source.setdefault(result.source, []).append(result)
         
-        self.all_results = unique_results
+        self.all_results = list(by_url.values())
+        self.by_source = by_source
         
         return self.all_results
     
     def print_results(self):
-        """Print formatted results to console"""
-        print(f"\n{Colors.HEADER}{Colors.BOLD}📊 Search Results{Colors.ENDC}")
-        print(f"{Colors.CYAN}Total results: {Colors.BOLD}{len(self.all_results)}{Colors.ENDC}")
-        print(f"{Colors.CYAN}Search time: {Colors.BOLD}{self.search_time:.2f}s{Colors.ENDC}\n")
+        """Print formatted results to console in a single buffered write"""
+        lines = [
+            f"\n{Colors.HEADER}{Colors.BOLD}📊 Search Results{Colors.ENDC}",
+            f"{Colors.CYAN}Total results: {Colors.BOLD}{len(self.all_results)}{Colors.ENDC}",
+            f"{Colors.CYAN}Search time: {Colors.BOLD}{self.search_time:.2f}s{Colors.ENDC}\n"
+        ]
         
         if not self.all_results:
-            print(f"{Colors.YELLOW}No results found for '{self.keyword}'{Colors.ENDC}")
-            return
-        
-        # Group by source
-        by_source = {}
-        for result in self.all_results:
-            source = result.get('source', 'unknown')
-            if source not in by_source:
-                by_source[source] = []
-            by_source[source].append(result)
+            lines.append(f"{Colors.YELLOW}No results found for '{self.keyword}'{Colors.ENDC}")
         
         # Print results by source
-        for source, results in by_source.items():
-            print(f"{Colors.BOLD}{source.upper()}{Colors.ENDC} ({len(results)} results):")
-            print("─" * 80)
+        for source, results in self.by_source.items():
+            lines.append(f"{Colors.BOLD}{source.upper()}{Colors.ENDC} ({len(results)} results):")
+            lines.append("─" * 80)
             
             for i, result in enumerate(results, 1):
-                print(f"{Colors.BLUE}{i}. {result.get('title', 'N/A')}{Colors.ENDC}")
-                print(f"   {result.get('description', 'No description')[:100]}...")
-                print(f"   🔗 {result.get('url', 'N/A')[:70]}...")
-                print()
+                lines.append(f"{Colors.BLUE}{i}. {result.title}{Colors.ENDC}")
+                lines.append(f"   {result.description[:100]}...")
+                lines.append(f"   🔗 {result.url[:70]}...")
+                lines.append("")
+        
+        lines.append("")
+        sys.stdout.write("\n".join(lines))
+        sys.stdout.flush()
 
 
 # ============================================================================
@@ -461,17 +495,16 @@ def main():
         
         # Generate report
         if args.output:
-            if args.format == config.OUTPUT_FORMAT_JSON:
-                report = ReportGenerator.to_json(gatherer.all_results, args.keyword, gatherer.search_time, sources)
-            else:  # CSV
-                report = ReportGenerator.to_csv(gatherer.all_results)
-            
-            # Write to file
             output_path = config.OUTPUT_DIR / args.output
             output_path.parent.mkdir(parents=True, exist_ok=True)
             
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(report)
+            if args.format == config.OUTPUT_FORMAT_JSON:
+                report = ReportGenerator.to_json(gatherer.all_results, args.keyword, gatherer.search_time, sources)
+                with open(output_path, 'wb') as f:
+                    f.write(report)
+            else:  # CSV
+                with open(output_path, 'w', encoding='utf-8', newline='') as f:
+                    ReportGenerator.to_csv(gatherer.all_results, f)
             
             print(f"\n{Colors.GREEN}✓{Colors.ENDC} Report saved: {Colors.BOLD}{output_path}{Colors.ENDC}")
     